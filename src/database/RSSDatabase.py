@@ -1,12 +1,109 @@
+import atexit
+import logging
 import sqlite3
-import json
-from typing import List, Dict, Any, Optional
-from datetime import datetime
-from pathlib import Path
+import threading
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Dict, Any, Optional, Set, Tuple
+from datetime import datetime, time
 
 from sources.BaseSource import RSSItem
 from .utils import adapt_timeobj, convert_timeobj
 
+logger = logging.getLogger(__name__)
+
+# Adapters are process-wide, so register them once at import
+# Converts DT.time to TEXT when inserting
+sqlite3.register_adapter(time, adapt_timeobj)
+
+# Converts TEXT to DT.time when selecting
+sqlite3.register_converter("timeobj", convert_timeobj)
+
+# Statements used on the hot paths are kept as constants so the connection's
+# statement cache, which is keyed by SQL text, hits on every call
+_SQL_INSERT_ITEM = """
+    INSERT OR IGNORE INTO rss_items
+    (title, link, description, content, published, source)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+# Resolves item_id from (title, source) inside the INSERT itself
+_SQL_INSERT_LLM = """
+    INSERT INTO llm_results
+    (item_id, query_id, llm_response, created_at)
+    SELECT id, ?, ?, ? FROM rss_items WHERE title = ? AND source = ? LIMIT 1
+"""
+
+# Items handed out by get_unmatched_items are addressed by id; titles are not unique
+_SQL_INSERT_LLM_FOR_ITEM = """
+    INSERT INTO llm_results
+    (query_id, item_id, llm_response, created_at)
+    VALUES (?, ?, ?, ?)
+"""
+
+_SQL_INSERT_SKIPPED_MATCH = (
+    "INSERT OR IGNORE INTO skipped_matches (query_id, item_id) VALUES (?, ?)"
+)
+
+_SQL_RESOLVE_QUERY_WITH_ITEM = (
+    "UPDATE queries SET resolved = 1, resolved_by = ? WHERE id = ?"
+)
+
+_SQL_RESOLVE_QUERY = """
+    UPDATE queries
+    SET resolved = 1,
+        resolved_by = (
+            SELECT id FROM rss_items WHERE title = ? AND source = ? LIMIT 1
+        )
+    WHERE id = ?
+    AND EXISTS (SELECT 1 FROM rss_items WHERE title = ? AND source = ?)
+"""
+
+_SQL_INSERT_CACHED_RESULT = (
+    "INSERT OR REPLACE INTO llm_cache (hash, llm_response) VALUES (?, ?)"
+)
+
+# The cache keeps at most this many results; the oldest are dropped first,
+# which also retires results of a replaced model or prompt over time
+LLM_CACHE_LIMIT = 100_000
+
+# Rowids grow with every insert or replace, so they order entries by age
+_SQL_PRUNE_CACHE = (
+    "DELETE FROM llm_cache WHERE rowid <= (SELECT max(rowid) FROM llm_cache) - ?"
+)
+
+# Keys are looked up in chunks to stay below SQLite's bound-variable limit
+_CACHE_LOOKUP_CHUNK = 500
+
+_SQL_SELECT_QUERIES = "SELECT id, query, resolved, resolved_by FROM queries"
+
+# One statement per filter value keeps both variants cached and index-backed
+_SQL_SELECT_RESOLVED_QUERIES = _SQL_SELECT_QUERIES + " WHERE resolved = 1"
+
+# Queries inserted without a resolved value count as open; the OR of two
+# equality terms is still answered from idx_queries_resolved
+_SQL_SELECT_OPEN_QUERIES = (
+    _SQL_SELECT_QUERIES + " WHERE resolved = 0 OR resolved IS NULL"
+)
+
+
+# Stored items of a source with the ids of the open queries they have neither
+# an LLM result nor a recorded skip for; settled items are left out
+_SQL_SELECT_UNMATCHED_ITEMS = """
+    SELECT i.id, i.title, i.link, i.description, i.published, i.content, i.source,
+           group_concat(q.id)
+    FROM rss_items i
+    JOIN queries q ON q.resolved = 0 OR q.resolved IS NULL
+    WHERE i.source = ?
+    AND NOT EXISTS (
+        SELECT 1 FROM llm_results r WHERE r.item_id = i.id AND r.query_id = q.id
+    )
+    AND NOT EXISTS (
+        SELECT 1 FROM skipped_matches s WHERE s.item_id = i.id AND s.query_id = q.id
+    )
+    GROUP BY i.id
+    ORDER BY i.id
+"""
+
 
 class RSSDatabase:
     """SQLite database for storing RSS items and LLM processing results"""
@@ -20,21 +117,76 @@ class RSSDatabase:
         """
         self.db_path = db_path
 
-        # Converts DT.time to TEXT when inserting
-        sqlite3.register_adapter(datetime.time, adapt_timeobj)
-
-        # Converts TEXT to DT.time when selecting
-        sqlite3.register_converter("timeobj", convert_timeobj)
+        # One long-lived connection keeps SQLite's page cache and prepared
+        # statements warm between calls; the lock serialises access to it
+        self._conn = self._connect()
+        self._lock = threading.Lock()
+        atexit.register(self.close)
 
         self._create_tables()
 
+    def close(self):
+        """Close the underlying database connection"""
+        with self._lock:
+            try:
+                # Refresh planner statistics for the tables this connection used,
+                # so the indexes keep getting picked as the tables grow
+                self._conn.execute("PRAGMA optimize")
+            except sqlite3.ProgrammingError:
+                return  # Already closed
+            self._conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Open a connection to the database
+
+        The statement cache is sized so every query this class issues stays
+        prepared for the lifetime of the connection. Durability is relaxed
+        to synchronous=NORMAL, which is safe under WAL journaling (enabled
+        once in _create_tables) and avoids an fsync on every commit.
+
+        Returns:
+            A new SQLite connection
+        """
+        conn = sqlite3.connect(
+            self.db_path,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            cached_statements=256,
+            check_same_thread=False,
+        )
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-65536")
+        conn.execute("PRAGMA busy_timeout=5000")
+        # Read pages through a 256 MiB memory map instead of read() calls; this
+        # reserves virtual address space, it does not add to resident memory
+        conn.execute("PRAGMA mmap_size=268435456")
+        return conn
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow the shared connection for one transaction
+
+        Commits when the block succeeds and rolls back if it raises.
+
+        Yields:
+            The instance's SQLite connection
+        """
+        with self._lock, self._conn:
+            yield self._conn
+
     def _create_tables(self):
         """Create the necessary database tables"""
-        with sqlite3.connect(
-            self.db_path, detect_types=sqlite3.PARSE_DECLTYPES
-        ) as conn:
+        with self._connection() as conn:
             cursor = conn.cursor()
 
+            # Only takes effect on a new database, before WAL is enabled
+            cursor.execute("PRAGMA page_size=8192")
+
+            # WAL persists in the database file, so it only needs setting once
+            cursor.execute("PRAGMA journal_mode=WAL")
+
             # Create RSS items table
             cursor.execute(
                 """
@@ -86,11 +238,42 @@ class RSSDatabase:
                     name TEXT UNIQUE NOT NULL,
                     url TEXT NOT NULL,
                     last_consumed TEXT,
+                    etag TEXT,
+                    modified TEXT,
                     created_at TEXT DEFAULT CURRENT_TIMESTAMP
                 )
             """
             )
 
+            # Add HTTP validator columns to sources tables created before them
+            cursor.execute("PRAGMA table_info(sources)")
+            source_columns = {row[1] for row in cursor.fetchall()}
+            for column in ("etag", "modified"):
+                if column not in source_columns:
+                    cursor.execute(f"ALTER TABLE sources ADD COLUMN {column} TEXT")
+
+            # Create LLM result cache, keyed by a hash of query and article text
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    hash TEXT PRIMARY KEY,
+                    llm_response INTEGER NOT NULL
+                )
+            """
+            )
+
+            # Create table of item/query pairs ranked too low to reach the LLM
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS skipped_matches (
+                    item_id INTEGER NOT NULL,
+                    query_id INTEGER NOT NULL,
+                    PRIMARY KEY (item_id, query_id),
+                    FOREIGN KEY (item_id) REFERENCES rss_items (id)
+                ) WITHOUT ROWID
+            """
+            )
+
             # Create indexes for better performance
             cursor.execute(
                 "CREATE INDEX IF NOT EXISTS idx_rss_items_source ON rss_items(source)"
@@ -101,60 +284,56 @@ class RSSDatabase:
             cursor.execute(
                 "CREATE INDEX IF NOT EXISTS idx_llm_results_query_id ON llm_results(query_id)"
             )
+            cursor.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS uq_rss_items_link_source ON rss_items(link, source)"
+            )
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_rss_items_title_source ON rss_items(title, source)"
+            )
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_llm_results_item_query ON llm_results(item_id, query_id)"
+            )
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_queries_resolved ON queries(resolved)"
+            )
 
             conn.commit()
 
-    def store_rss_items(self, items: List[RSSItem]) -> int:
+    def store_rss_items(self, items: Iterable[RSSItem]) -> int:
         """
         Store RSS items in the database
 
+        Items are converted to rows as executemany consumes them and written
+        in one transaction; the unique (link, source) index makes already
+        known items no-ops.
+
         Args:
-            items: List of RSS items to store
+            items: RSS items to store
 
         Returns:
             Number of items successfully stored
         """
-        stored_count = 0
-
-        with sqlite3.connect(
-            self.db_path, detect_types=sqlite3.PARSE_DECLTYPES
-        ) as conn:
-            cursor = conn.cursor()
-
-            for item in items:
-                try:
-                    cursor.execute(
-                        "SELECT id FROM rss_items WHERE link = ? AND source = ?",
-                        (item.link, item.source),
-                    )
-                    exists = cursor.fetchone()
-                    if exists:
-                        continue  # Skip if already exists
-
-                    cursor.execute(
-                        """
-                        INSERT OR REPLACE INTO rss_items 
-                        (title, link, description, content, published, source)
-                        VALUES (?, ?, ?, ?, ?, ?)
-                    """,
-                        (
-                            item.title,
-                            item.link,
-                            item.description,
-                            item.content,
-                            item.published,
-                            item.source,
-                        ),
-                    )
-                    stored_count += 1
-
-                except sqlite3.Error as e:
-                    print(f"Error storing RSS item '{item.title}': {e}")
-                    continue
+        rows = (
+            (
+                item.title,
+                item.link,
+                item.description,
+                item.content,
+                item.published,
+                item.source,
+            )
+            for item in items
+        )
 
-            conn.commit()
+        try:
+            with self._connection() as conn:
+                before = conn.total_changes
+                conn.executemany(_SQL_INSERT_ITEM, rows)
+                return conn.total_changes - before
 
-        return stored_count
+        except sqlite3.Error as e:
+            logger.error("Error storing RSS items: %s", e)
+            return 0
 
     def store_llm_results(
         self, query_id: int, item_title: str, source: str, response: str
@@ -162,7 +341,7 @@ class RSSDatabase:
         """
         Store LLM processing results in the database.
         Uses query_id as a foreign key from the queries table.
-        Finds item_id using item_title and source.
+        Finds item_id using item_title and source within the same INSERT.
 
         Args:
             query_id: ID of the query in the queries table
@@ -175,44 +354,137 @@ class RSSDatabase:
         """
         stored_count = 0
 
-        with sqlite3.connect(
-            self.db_path, detect_types=sqlite3.PARSE_DECLTYPES
-        ) as conn:
-            cursor = conn.cursor()
+        with self._connection() as conn:
             try:
-                # Find item_id using title and source
-                cursor.execute(
-                    "SELECT id FROM rss_items WHERE title = ? AND source = ?",
-                    (item_title, source),
+                cursor = conn.execute(
+                    _SQL_INSERT_LLM,
+                    (
+                        query_id,
+                        response,
+                        datetime.now().isoformat(),
+                        item_title,
+                        source,
+                    ),
                 )
-                item_row = cursor.fetchone()
-                if not item_row:
-                    print(
-                        f"RSS item not found for title '{item_title}' and source '{source}'."
+                if cursor.rowcount == 0:
+                    logger.warning(
+                        "RSS item not found for title '%s' and source '%s'.",
+                        item_title,
+                        source,
                     )
                     return 0
-                item_id = item_row[0]
-
-                # Insert into llm_results using query_id and found item_id
-                cursor.execute(
-                    """
-                    INSERT INTO llm_results 
-                    (item_id, query_id, llm_response, created_at)
-                    VALUES (?, ?, ?, ?)
-                """,
-                    (item_id, query_id, response, datetime.now().isoformat()),
-                )
                 stored_count += 1
 
             except sqlite3.Error as e:
-                print(
-                    f"Error storing LLM result for '{(item_title, source, query_id)}': {e}"
+                logger.error(
+                    "Error storing LLM result for '%s': %s",
+                    (item_title, source, query_id),
+                    e,
                 )
 
             conn.commit()
 
         return stored_count
 
+    def store_llm_results_batch(
+        self, results: Iterable[Tuple[int, int, Any]]
+    ) -> int:
+        """
+        Store many LLM processing results in a single transaction.
+
+        Args:
+            results: (query_id, item_id, response) tuples, with item ids as
+                returned by get_unmatched_items; consumed lazily, so a
+                generator keeps memory flat for large batches
+
+        Returns:
+            Number of results successfully stored
+        """
+        created_at = datetime.now().isoformat()  # One timestamp for the whole batch
+        rows = (
+            (query_id, item_id, response, created_at)
+            for query_id, item_id, response in results
+        )
+
+        try:
+            with self._connection() as conn:
+                before = conn.total_changes
+                conn.executemany(_SQL_INSERT_LLM_FOR_ITEM, rows)
+                return conn.total_changes - before
+
+        except sqlite3.Error as e:
+            logger.error("Error storing LLM results: %s", e)
+            return 0
+
+    def store_skipped_matches(self, skipped: Iterable[Tuple[int, int]]) -> int:
+        """
+        Record item/query pairs that were ranked but not sent to the LLM
+
+        Recorded pairs count as settled, so get_unmatched_items does not hand
+        the same items out for ranking again on every run.
+
+        Args:
+            skipped: (query_id, item_id) tuples; consumed lazily
+
+        Returns:
+            Number of pairs newly recorded
+        """
+        try:
+            with self._connection() as conn:
+                before = conn.total_changes
+                conn.executemany(_SQL_INSERT_SKIPPED_MATCH, skipped)
+                return conn.total_changes - before
+
+        except sqlite3.Error as e:
+            logger.error("Error storing skipped matches: %s", e)
+            return 0
+
+    def get_cached_llm_results(self, keys: List[str]) -> Dict[str, bool]:
+        """
+        Look up cached LLM results
+
+        Args:
+            keys: Cache keys of the article/query pairs to look up
+
+        Returns:
+            Cached results by key; keys without a cached result are absent
+        """
+        cached = {}
+
+        with self._connection() as conn:
+            for start in range(0, len(keys), _CACHE_LOOKUP_CHUNK):
+                chunk = keys[start : start + _CACHE_LOOKUP_CHUNK]
+                placeholders = ", ".join("?" * len(chunk))
+                for key, response in conn.execute(
+                    f"SELECT hash, llm_response FROM llm_cache WHERE hash IN ({placeholders})",
+                    chunk,
+                ):
+                    cached[key] = bool(response)
+
+        return cached
+
+    def store_cached_llm_results(self, results: Dict[str, bool]) -> int:
+        """
+        Cache LLM results for later runs
+
+        Only the LLM_CACHE_LIMIT most recently cached results are kept.
+
+        Args:
+            results: LLM results by cache key
+
+        Returns:
+            Number of results cached
+        """
+        try:
+            with self._connection() as conn:
+                conn.executemany(_SQL_INSERT_CACHED_RESULT, results.items())
+                conn.execute(_SQL_PRUNE_CACHE, (LLM_CACHE_LIMIT,))
+                return len(results)
+
+        except sqlite3.Error as e:
+            logger.error("Error caching %d LLM results: %s", len(results), e)
+            return 0
+
     def get_queries(self, resolved: Optional[bool] = None) -> List[Dict[str, Any]]:
         """
         Retrieve queries from the queries table.
@@ -223,58 +495,147 @@ class RSSDatabase:
         Returns:
             List of queries as dictionaries.
         """
-        with sqlite3.connect(
-            self.db_path, detect_types=sqlite3.PARSE_DECLTYPES
-        ) as conn:
+        with self._connection() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = sqlite3.Row  # Column names resolved in C
             if resolved is None:
-                cursor.execute("SELECT id, query, resolved, resolved_by FROM queries")
+                cursor.execute(_SQL_SELECT_QUERIES)
+            elif resolved:
+                cursor.execute(_SQL_SELECT_RESOLVED_QUERIES)
             else:
-                cursor.execute(
-                    "SELECT id, query, resolved, resolved_by FROM queries WHERE coalesce(resolved, ?) = ?",
-                    ((int(resolved)), (int(resolved))),
-                )
-            rows = cursor.fetchall()
-            return [
-                {
-                    "id": row[0],
-                    "query": row[1],
-                    "resolved": bool(row[2]),
-                    "resolved_by": row[3],
-                }
-                for row in rows
-            ]
-
-    def store_source_info(self, name: str, url: str):
+                cursor.execute(_SQL_SELECT_OPEN_QUERIES)
+            # Stream rows off the cursor instead of materialising fetchall()
+            return [dict(row, resolved=bool(row["resolved"])) for row in cursor]
+
+    def store_source_info(
+        self,
+        name: str,
+        url: str,
+        etag: Optional[str] = None,
+        modified: Optional[str] = None,
+    ):
         """
         Store or update source information
 
         Args:
-            source_info: Source metadata to store
+            name: Name of the source
+            url: URL of the source's feed
+            etag: ETag header of the last feed response
+            modified: Last-Modified header of the last feed response
         """
-        with sqlite3.connect(
-            self.db_path, detect_types=sqlite3.PARSE_DECLTYPES
-        ) as conn:
+        with self._connection() as conn:
             cursor = conn.cursor()
 
             try:
                 cursor.execute(
                     """
                     INSERT OR REPLACE INTO sources 
-                    (name, url, last_consumed)
-                    VALUES (?, ?, ?)
+                    (name, url, last_consumed, etag, modified)
+                    VALUES (?, ?, ?, ?, ?)
                 """,
                     (
                         name,
                         url,
                         datetime.now().isoformat(),
+                        etag,
+                        modified,
                     ),
                 )
 
                 conn.commit()
 
             except sqlite3.Error as e:
-                print(f"Error storing source info for '{name}': {e}")
+                logger.error("Error storing source info for '%s': %s", name, e)
+
+    def get_source_info(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve stored information about a source
+
+        Args:
+            name: Name of the source
+
+        Returns:
+            The source's url, last_consumed, etag and modified values, or None
+            if the source was never stored
+        """
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = sqlite3.Row
+            cursor.execute(
+                "SELECT url, last_consumed, etag, modified FROM sources WHERE name = ?",
+                (name,),
+            )
+            row = cursor.fetchone()
+            return dict(row) if row else None
+
+    def get_known_links(self, source: str) -> Set[str]:
+        """
+        Retrieve the links of all items stored for a source
+
+        Args:
+            source: Name of the source
+
+        Returns:
+            Set of stored item links
+        """
+        with self._connection() as conn:
+            return {
+                row[0]
+                for row in conn.execute(
+                    "SELECT link FROM rss_items WHERE source = ?", (source,)
+                )
+            }
+
+    def get_unmatched_items(
+        self, source: str
+    ) -> List[Tuple[int, RSSItem, Set[int]]]:
+        """
+        Retrieve stored items of a source that still need matching
+
+        An item qualifies while some open query has neither an LLM result nor
+        a recorded skip for it, so items whose matching failed are picked up
+        again, as are all stored items once for a newly added query.
+
+        Args:
+            source: Name of the source
+
+        Returns:
+            (item id, item, ids of the open queries without a result for it)
+            tuples
+        """
+        with self._connection() as conn:
+            return [
+                (
+                    item_id,
+                    RSSItem(title, link, description, published, content, item_source),
+                    {int(query_id) for query_id in query_ids.split(",")},
+                )
+                for item_id, title, link, description, published, content, item_source, query_ids in conn.execute(
+                    _SQL_SELECT_UNMATCHED_ITEMS, (source,)
+                )
+            ]
+
+    def resolve_query_with_item(self, query_id: int, item_id: int) -> bool:
+        """
+        Mark a query as resolved by a stored item
+
+        Args:
+            query_id: ID of the query to resolve
+            item_id: ID of the RSS item that resolved the query
+
+        Returns:
+            True if the query was updated, False otherwise
+        """
+        with self._connection() as conn:
+            try:
+                cursor = conn.execute(_SQL_RESOLVE_QUERY_WITH_ITEM, (item_id, query_id))
+                if cursor.rowcount == 0:
+                    logger.warning("Query %s not found.", query_id)
+                    return False
+                return True
+            except sqlite3.Error as e:
+                logger.error("Error resolving query %s: %s", query_id, e)
+                return False
 
     def resolve_query(
         self, query_id: int, resolved_by_item_title: str, resolved_by_source: str
@@ -284,40 +645,28 @@ class RSSDatabase:
 
         Args:
             query_id: ID of the query to resolve
-            resolved_by_item_id: Optional RSS item ID that resolved the query
+            resolved_by_item_title: Title of the RSS item that resolved the query
+            resolved_by_source: Source name of that RSS item
 
         Returns:
             True if the query was updated, False otherwise
         """
-        with sqlite3.connect(
-            self.db_path, detect_types=sqlite3.PARSE_DECLTYPES
-        ) as conn:
-            cursor = conn.cursor()
+        with self._connection() as conn:
             try:
-                # Find item_id using title and source
-                cursor.execute(
-                    "SELECT id FROM rss_items WHERE title = ? AND source = ?",
-                    (resolved_by_item_title, resolved_by_source),
+                item_key = (resolved_by_item_title, resolved_by_source)
+                cursor = conn.execute(
+                    _SQL_RESOLVE_QUERY, (*item_key, query_id, *item_key)
                 )
-                item_row = cursor.fetchone()
-                if not item_row:
-                    print(
-                        f"RSS item not found for title '{resolved_by_item_title}' and source '{resolved_by_source}'."
-                    )
-                    return 0
-                resolved_by_item_id = item_row[0]
-
-                if resolved_by_item_id is not None:
-                    cursor.execute(
-                        "UPDATE queries SET resolved = 1, resolved_by = ? WHERE id = ?",
-                        (resolved_by_item_id, query_id),
-                    )
-                else:
-                    cursor.execute(
-                        "UPDATE queries SET resolved = 1 WHERE id = ?", (query_id,)
+                if cursor.rowcount == 0:
+                    logger.warning(
+                        "Query %s or RSS item for title '%s' and source '%s' not found.",
+                        query_id,
+                        resolved_by_item_title,
+                        resolved_by_source,
                     )
+                    return False
                 conn.commit()
-                return cursor.rowcount > 0
+                return True
             except sqlite3.Error as e:
-                print(f"Error resolving query {query_id}: {e}")
+                logger.error("Error resolving query %s: %s", query_id, e)
                 return False
@@ -1,16 +1,20 @@
 import sqlite3
 import datetime
 
+# datetime.time is stored as one integer with its fields packed into bits:
+#   hour << 32 | minute << 26 | second << 20 | microsecond
+# microsecond < 2**20, second and minute < 2**6, hour < 2**5, so the fields
+# never overlap and the value fits comfortably in SQLite's 64-bit INTEGER.
+_MICROSECOND_MASK = (1 << 20) - 1
+_SIX_BIT_MASK = (1 << 6) - 1
+
 def adapt_timeobj(timeobj):
-    return ((3600*timeobj.hour + 60*timeobj.minute + timeobj.second)*10**6 
-            + timeobj.microsecond)
+    return ((timeobj.hour << 32) | (timeobj.minute << 26)
+            | (timeobj.second << 20) | timeobj.microsecond)
 
 def convert_timeobj(val):
     val = int(val)
-    hour, val = divmod(val, 3600*10**6)
-    minute, val = divmod(val, 60*10**6)
-    second, val = divmod(val, 10**6)
-    microsecond = int(val)
-    return datetime.time(hour, minute, second, microsecond)
-
-
+    return datetime.time(val >> 32,
+                         (val >> 26) & _SIX_BIT_MASK,
+                         (val >> 20) & _SIX_BIT_MASK,
+                         val & _MICROSECOND_MASK)
@@ -1,21 +1,59 @@
+import logging
+from typing import Dict, List, Optional, Tuple
 
 from vllm import LLM
 from vllm.sampling_params import SamplingParams
 
+from .utils import DEFAULT_MODEL_NAME, MAX_MODEL_LEN, PROMPT_TEMPLATE, cache_namespace
+
+logger = logging.getLogger(__name__)
+
+# The answer is a single generated token
+ANSWER_TOKENS = 1
+
+# Slack for tokens merging differently where the article meets the template text
+BOUNDARY_TOKENS = 8
+
+# Loaded models by (model_name, quantization), shared by all matchers in the process
+_LLM_CACHE: Dict[Tuple[str, Optional[str]], LLM] = {}
+
+
 class ArticleQueryMatcher:
-    def __init__(self, model_name="mistralai/Mistral-7B-v0.1"):
+    def __init__(self, model_name=DEFAULT_MODEL_NAME, quantization: Optional[str] = None):
         """
         Initialize the model and tokenizer.
+
+        Args:
+            model_name (str): Hugging Face id or path of the model to load.
+            quantization (Optional[str]): vLLM quantization method, e.g. "awq" or
+                "gptq", when model_name points at a checkpoint quantized that way.
+                A 4-bit checkpoint roughly halves VRAM and speeds up decoding,
+                with negligible effect on a Yes/No answer.
         """
         
         self.model_name = model_name
+        self.quantization = quantization
+
+        # Cached match results are only valid for this model and prompt
+        self.cache_namespace = cache_namespace(model_name, quantization)
 
-        self.sampling_params = SamplingParams(max_tokens=4096)
+        # The answer is a single "Yes" or "No": one prefill and one scored token
+        # is enough, the decision is read from that token's logprobs
+        self.sampling_params = SamplingParams(max_tokens=1, temperature=0.0, logprobs=20)
 
         # note that running Ministral 8B on a single GPU requires 24 GB of GPU RAM
         # If you want to divide the GPU requirement over multiple devices, please add *e.g.* `tensor_parallel=2`
         #self.llm = LLM(model=model_name, tokenizer_mode="mistral", config_format="mistral", load_format="mistral")
-        self.llm = LLM(model="microsoft/Phi-3-mini-128k-instruct", gpu_memory_utilization=0.9, max_model_len=4096)
+        # Prefix caching reuses the KV cache of the shared instruction block
+        # across prompts; main.py batches pairs grouped by article, so the
+        # article text is shared between consecutive prompts as well
+        # Loaded models are shared, so further matchers for the same model skip
+        # the multi-second load and a second copy of the weights in GPU memory
+        cache_key = (model_name, quantization)
+        if cache_key not in _LLM_CACHE:
+            _LLM_CACHE[cache_key] = LLM(model=model_name, quantization=quantization, gpu_memory_utilization=0.9, max_model_len=MAX_MODEL_LEN, enable_prefix_caching=True)
+        self.llm = _LLM_CACHE[cache_key]
+        self.tokenizer = self.llm.get_tokenizer()
 
 
     def check_match(self, article_text: str, query: str) -> bool:
@@ -30,33 +68,141 @@ class ArticleQueryMatcher:
         Returns:
             bool: True if the article text matches the query, False otherwise.
         """
-        # Combine article and query into a single prompt
+        return self.check_match_many([(article_text, query)])[0]
+
+    def check_match_many(self, pairs: List[Tuple[str, str]]) -> List[bool]:
+        """
+        Check many (article text, query) pairs in a single batched model call.
+
+        Submitting all prompts at once lets vLLM schedule them together
+        instead of running one generation per pair.
+
+        Args:
+            pairs (List[Tuple[str, str]]): (article_text, query) pairs.
+
+        Returns:
+            List[bool]: One match result per pair, in input order. Pairs whose
+                query alone exceeds the model context are not matched.
+        """
+        if not pairs:
+            return []
+
+        # Each article is paired with several queries, and each query with several
+        # articles; tokenize every distinct text only once
+        article_ids = {
+            article_text: self._encode(article_text)
+            for article_text in dict.fromkeys(article_text for article_text, _ in pairs)
+        }
+        budgets = {query: self._article_budget(query) for query in dict.fromkeys(query for _, query in pairs)}
+
+        # Combine each article and query into a single-message conversation
+        results = [False] * len(pairs)
+        conversations, positions, fitted = [], [], {}
+        for position, (article_text, query) in enumerate(pairs):
+            budget = budgets[query]
+            if budget <= 0:
+                # The prompt alone would not fit; vLLM would reject the whole batch
+                logger.warning("Query too long for the model context, not matched: %s", query)
+                continue
+
+            if (article_text, budget) not in fitted:
+                fitted[article_text, budget] = self._truncate(article_text, article_ids[article_text], budget)
+            conversations.append([
+                {
+                    "role": "user",
+                    "content": PROMPT_TEMPLATE.format(article_text=fitted[article_text, budget], query=query)
+                },
+            ])
+            positions.append(position)
+
+        if not conversations:
+            return results
+
+        outputs = self.llm.chat(conversations, sampling_params=self.sampling_params)
+
+        # Check if each response indicates a match
+        for position, output in zip(positions, outputs):
+            results[position] = self._is_yes(output.outputs[0])
+        return results
+
+    @staticmethod
+    def _is_yes(completion) -> bool:
+        """
+        Decide a single-token completion by comparing "Yes" against "No".
 
-        prompt = f"""
-        Du bist ein präziser Assistent, der prüft, ob ein gegebener Artikel eine kurze Frage beantwortet.
-Analysiere den folgenden Artikeltext und beantworte die Frage ausschließlich mit "Yes" oder "No".
+        Args:
+            completion: vLLM CompletionOutput generated with logprobs enabled.
+
+        Returns:
+            bool: True if "Yes" is more likely than "No" as the first token.
+        """
+        best = {"Yes": float("-inf"), "No": float("-inf")}
+        for logprob in completion.logprobs[0].values():
+            answer = (logprob.decoded_token or "").strip()
+            if answer in best:
+                best[answer] = max(best[answer], logprob.logprob)
 
-**Artikeltext:**
-{article_text}
+        if best["Yes"] == best["No"]:
+            # Neither answer among the top candidates; fall back to the text
+            return completion.text.lstrip().startswith("Y")
 
-**Frage:**
-{query}
+        return best["Yes"] > best["No"]
 
-**Anforderungen:**
-- Beantworte die Frage nur mit "Yes" oder "No".
-- Berücksichtige nur die Informationen, die explizit im Artikeltext stehen.
-- Wenn die Antwort nicht eindeutig aus dem Artikel hervorgeht, antworte mit "No".
-- Ignoriere Kontextwissen oder Annahmen außerhalb des Artikeltexts.
+    def _encode(self, text: str) -> List[int]:
         """
-        messages = [
-            {
-                "role": "user",
-                "content": prompt
-            },
-        ]
+        Tokenize text without special tokens.
 
-        outputs = self.llm.chat(messages, sampling_params=self.sampling_params)
+        Args:
+            text (str): Text to tokenize.
+
+        Returns:
+            List[int]: The token ids.
+        """
+        return self.tokenizer.encode(text, add_special_tokens=False)
+
+    def _article_budget(self, query: str) -> int:
+        """
+        Number of article tokens that fit into MAX_MODEL_LEN next to the query.
+
+        The prompt is rendered through the chat template with an empty article,
+        as llm.chat renders it, so instructions, query and template tokens are
+        all accounted for, plus the answer token.
+
+        Args:
+            query (str): The query the article is matched against.
+
+        Returns:
+            int: The article token budget; zero or less if the prompt alone is too long.
+        """
+        prompt = PROMPT_TEMPLATE.format(article_text="", query=query)
+        prompt_ids = self.tokenizer.apply_chat_template(
+            [{"role": "user", "content": prompt}], tokenize=True, add_generation_prompt=True
+        )
+        return MAX_MODEL_LEN - len(prompt_ids) - ANSWER_TOKENS - BOUNDARY_TOKENS
+
+    def _truncate(self, article_text: str, token_ids: List[int], budget: int) -> str:
+        """
+        Cut the article text to at most budget tokens.
+
+        Decoded text can tokenize into more tokens than it was cut from, so the
+        cut is re-checked and shortened by the excess until it fits.
+
+        Args:
+            article_text (str): The text from the news article.
+            token_ids (List[int]): The article's token ids, from _encode.
+            budget (int): Maximum number of article tokens.
+
+        Returns:
+            str: The article text, shortened if it exceeded the token budget.
+        """
+        if len(token_ids) <= budget:
+            return article_text
 
-        # Check if the response indicates a match
-        return "Yes" in outputs[0].outputs[0].text
-    
\ No newline at end of file
+        length = budget
+        while length > 0:
+            text = self.tokenizer.decode(token_ids[:length])
+            excess = len(self._encode(text)) - budget
+            if excess <= 0:
+                return text
+            length -= excess
+        return ""
@@ -0,0 +1,143 @@
+import hashlib
+import math
+import re
+from collections import Counter
+from typing import List, Optional, Set
+
+_TOKEN_RE = re.compile(r'\w+')
+
+DEFAULT_MODEL_NAME = "microsoft/Phi-3-mini-128k-instruct"
+
+# Built once at import; ArticleQueryMatcher only substitutes the two fields
+PROMPT_TEMPLATE = """
+        Du bist ein präziser Assistent, der prüft, ob ein gegebener Artikel eine kurze Frage beantwortet.
+Analysiere den folgenden Artikeltext und beantworte die Frage ausschließlich mit "Yes" oder "No".
+
+**Artikeltext:**
+{article_text}
+
+**Frage:**
+{query}
+
+**Anforderungen:**
+- Beantworte die Frage nur mit "Yes" oder "No".
+- Berücksichtige nur die Informationen, die explizit im Artikeltext stehen.
+- Wenn die Antwort nicht eindeutig aus dem Artikel hervorgeht, antworte mit "No".
+- Ignoriere Kontextwissen oder Annahmen außerhalb des Artikeltexts.
+        """
+
+# Context length the model is loaded with; articles are cut to whatever room
+# the rendered prompt and the answer token leave in it
+MAX_MODEL_LEN = 2048
+
+
+def cache_namespace(model_name: str = DEFAULT_MODEL_NAME, quantization: Optional[str] = None) -> str:
+    """
+    Identifies the model and prompt settings a match result was produced with.
+    Changing any of them yields a new namespace, so results of an earlier setup
+    are never served from the cache.
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    for part in (model_name, quantization or "", PROMPT_TEMPLATE, str(MAX_MODEL_LEN)):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def match_cache_key(article_text: str, query: str, namespace: str) -> str:
+    """
+    Builds the key under which the match result of an article/query pair is cached.
+    Apart from the namespace of cache_namespace the key only depends on the texts,
+    so an article that reappears in a later run or in another feed hits the cache
+    without another model call.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(namespace.encode())
+    digest.update(b"\0")
+    digest.update(query.encode())
+    digest.update(b"\0")
+    digest.update(article_text.encode())
+    return digest.hexdigest()
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Splits text into lowercase word tokens for lexical ranking.
+    """
+    return _TOKEN_RE.findall(text.lower())
+
+
+class BM25Index:
+    """Okapi BM25 ranking over a fixed set of documents"""
+
+    def __init__(self, documents: List[str], k1: float = 1.5, b: float = 0.75):
+        """
+        Tokenize and index the documents once
+
+        Args:
+            documents: Texts to rank, addressed by their position
+            k1: Term frequency saturation
+            b: Document length normalisation
+        """
+        self.k1 = k1
+        self.b = b
+        self.term_counts = [Counter(tokenize(document)) for document in documents]
+        self.lengths = [sum(counts.values()) for counts in self.term_counts]
+        self.average_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+
+        document_frequency = Counter()
+        for counts in self.term_counts:
+            document_frequency.update(counts.keys())
+
+        # Non-negative idf variant, so every shared term adds to the score
+        n = len(documents)
+        self.idf = {
+            term: math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for term, df in document_frequency.items()
+        }
+
+    def scores(self, query: str) -> List[float]:
+        """
+        Score every document against the query
+
+        Args:
+            query: Query text
+
+        Returns:
+            One BM25 score per document, in document order
+        """
+        query_terms = [term for term in set(tokenize(query)) if term in self.idf]
+        scores = []
+
+        for counts, length in zip(self.term_counts, self.lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / (self.average_length or 1.0))
+            score = 0.0
+            for term in query_terms:
+                tf = counts.get(term)
+                if tf:
+                    score += self.idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            scores.append(score)
+
+        return scores
+
+    def top_n(self, query: str, n: int, positions: Optional[Set[int]] = None) -> List[int]:
+        """
+        Positions of the n documents ranking highest for the query
+
+        Documents sharing no term with the query score zero and are never
+        returned, so obviously unrelated items skip the model entirely.
+
+        Args:
+            query: Query text
+            n: Maximum number of documents to return
+            positions: If set, only these documents are considered
+
+        Returns:
+            Document positions, best match first
+        """
+        scores = self.scores(query)
+        matching = [
+            position for position, score in enumerate(scores)
+            if score > 0 and (positions is None or position in positions)
+        ]
+        return sorted(matching, key=scores.__getitem__, reverse=True)[:n]
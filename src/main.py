@@ -1,14 +1,19 @@
-import sys
+import logging
+
 from sources.OTSRSS import OTSRSSSource
 from sources.ORFNewsRSS import ORFNewsRSSSource
+from sources.utils import consume_many
 from database.RSSDatabase import RSSDatabase
-from llm.ArticleQueryMatcher import ArticleQueryMatcher
-import itertools
+from llm.utils import BM25Index, cache_namespace, match_cache_key
+
+# Number of items per query that go through the LLM after lexical ranking
+MAX_CANDIDATES_PER_QUERY = 10
 
-import feedparser
+logger = logging.getLogger(__name__)
 
 if __name__ == "__main__":
-    print('Init')
+    logging.basicConfig(level=logging.INFO)
+    logger.info('Init')
 
     sources = [
         OTSRSSSource(name="OTS RSS Feed"),
@@ -18,20 +23,89 @@ if __name__ == "__main__":
     #sources[0].consume() 
 
     database = RSSDatabase() 
-    matcher = ArticleQueryMatcher()
+    matcher = None  # Loaded on first use; runs without open queries skip the model
+    namespace = cache_namespace()  # Same model and settings as ArticleQueryMatcher()
 
     for source in sources:
-        print(f'Consuming RSS feed {source.name}')
-        items = source.consume()
-        database.store_source_info(source.name, source.url)
+        # Let the source skip unchanged feeds and downloading already stored articles
+        source_info = database.get_source_info(source.name)
+        if source_info:
+            source.etag = source_info['etag']
+            source.modified = source_info['modified']
+        source.known_links = database.get_known_links(source.name)
+
+    # Feeds live on different hosts, so they are fetched side by side
+    logger.info('Consuming %d RSS feeds', len(sources))
+    consumed = consume_many(sources)
+
+    for source, items in zip(sources, consumed):
+        logger.info('Processing RSS feed %s', source.name)
+
         database.store_rss_items(items)
 
         open_queries = database.get_queries(False)  # Fetch unresolved queries
 
-        for item, query in itertools.product(items, open_queries):
-            result = matcher.check_match(item.content, query['query'])
-            database.store_llm_results(query['id'], item.title, source.name, result)
-            
-            if result:
-                print(f"Query '{query['query']}' matched with item '{item.title}' from source '{source.name}'")
-                database.resolve_query(query['id'], item.title, source.name)
\ No newline at end of file
+        # Every stored item not yet settled for an open query: this run's new
+        # items, those of a failed run, and all of them once for a new query
+        unmatched = database.get_unmatched_items(source.name)
+        item_ids = [item_id for item_id, _, _ in unmatched]
+        items = [item for _, item, _ in unmatched]
+
+        # Positions of the items each open query is not settled for yet
+        pending = {query['id']: set() for query in open_queries}
+        for item_index, (_, _, query_ids) in enumerate(unmatched):
+            for query_id in query_ids:
+                pending.setdefault(query_id, set()).add(item_index)
+
+        # Only the items ranking highest for a query are sent to the model
+        index = BM25Index([item.content for item in items])
+        candidates = sorted(
+            (item_index, query_index)
+            for query_index, query in enumerate(open_queries)
+            for item_index in index.top_n(query['query'], MAX_CANDIDATES_PER_QUERY, pending[query['id']])
+        )
+        # Sorted by item so prompts sharing an article run back to back
+        pairs = [(item_ids[i], items[i], open_queries[q]) for i, q in candidates]
+        shortlisted = {(query['id'], item_id) for item_id, _, query in pairs}
+
+        if pairs:
+            # Pairs already scored in an earlier run are served from the cache
+            keys = [match_cache_key(item.content, query['query'], namespace) for _, item, query in pairs]
+            matches = database.get_cached_llm_results(keys)
+            misses = {key: (item, query) for key, (_, item, query) in zip(keys, pairs) if key not in matches}
+
+            if misses:
+                if matcher is None:
+                    from llm.ArticleQueryMatcher import ArticleQueryMatcher
+                    matcher = ArticleQueryMatcher()
+
+                # Score every uncached (item, query) pair of this source in one batch
+                fresh = matcher.check_match_many(
+                    [(item.content, query['query']) for item, query in misses.values()]
+                )
+                fresh = dict(zip(misses, fresh))
+                database.store_cached_llm_results(fresh)
+                matches.update(fresh)
+
+            # One transaction for all of this source's results, streamed from the pairs
+            database.store_llm_results_batch(
+                (query['id'], item_id, matches[key])
+                for key, (item_id, _, query) in zip(keys, pairs)
+            )
+
+            for key, (item_id, item, query) in zip(keys, pairs):
+                if matches[key]:
+                    logger.info("Query '%s' matched with item '%s' from source '%s'", query['query'], item.title, source.name)
+                    database.resolve_query_with_item(query['id'], item_id)
+
+        # Items that missed a query's shortlist are settled as well, so they are
+        # not ranked again for that query on every later run
+        database.store_skipped_matches(
+            (query['id'], item_ids[i])
+            for query in open_queries
+            for i in pending[query['id']]
+            if (query['id'], item_ids[i]) not in shortlisted
+        )
+
+        # Validators last: if anything above fails, the next run fetches the feed again
+        database.store_source_info(source.name, source.url, source.etag, source.modified)
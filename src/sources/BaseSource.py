@@ -1,18 +1,37 @@
+import sys
+from collections import OrderedDict
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import Iterable, List, Dict, Any, Optional, Set
 from dataclasses import dataclass
 from datetime import datetime
 
+# Number of recently returned guids a source remembers to skip repeated entries
+SEEN_GUIDS_LIMIT = 5000
 
-@dataclass
+
+@dataclass(slots=True, eq=False)
 class RSSItem:
-    """Represents a single RSS feed item"""
+    """Represents a single RSS feed item, identified by its guid"""
     title: str
     link: str
     description: str
     published: datetime
     content: str
     source: str
+    guid: str = ""  # Defaults to the link for feeds without entry ids
+
+    def __post_init__(self):
+        # Every item of a feed repeats the same source name; share one copy
+        self.source = sys.intern(self.source)
+        self.guid = sys.intern(self.guid or self.link)
+
+    def __eq__(self, other):
+        if type(other) is not RSSItem:
+            return NotImplemented
+        return self.guid == other.guid
+
+    def __hash__(self):
+        return hash(self.guid)
 
 
 class BaseSource(ABC):
@@ -21,6 +40,30 @@ class BaseSource(ABC):
 
     def __init__(self, name: str):
         self.name = name
+
+        # HTTP validators of the last fetch, sent back so unchanged feeds answer 304
+        self.etag: Optional[str] = None
+        self.modified: Optional[str] = None
+
+        # Links already stored for this source; their articles are not fetched again
+        self.known_links: Set[str] = set()
+
+        # Guids returned by earlier consume calls, oldest first, at most SEEN_GUIDS_LIMIT
+        self._seen_guids: OrderedDict[str, None] = OrderedDict()
+    
+    def _remember_guids(self, guids: Iterable[str]) -> None:
+        """
+        Mark guids as returned, evicting the least recently seen beyond the limit
+        
+        Args:
+            guids: Guids of the items about to be returned
+        """
+        seen = self._seen_guids
+        for guid in guids:
+            seen[guid] = None
+            seen.move_to_end(guid)
+        while len(seen) > SEEN_GUIDS_LIMIT:
+            seen.popitem(last=False)
     
     @abstractmethod
     def consume(self) -> List[RSSItem]:
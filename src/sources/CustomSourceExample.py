@@ -5,10 +5,21 @@ This file demonstrates how to create a custom RSS source by inheriting from Base
 You can use this as a template to create sources for specific websites or RSS feeds.
 """
 
+import html
+import re
 from typing import List, Dict, Any
 from .BaseSource import BaseSource, RSSItem
 from .GenericRSS import GenericRSSSource
 
+# Compiled once at import instead of on every call
+_WHITESPACE_RE = re.compile(r'\s+')
+_BLOG_JUNK_RE = re.compile(r'Read more\.\.\.|Continue reading\.\.\.|Share this:|Tweet this:')
+
+# Example: Only process items with certain keywords. All keywords are matched in
+# one case-insensitive scan, so the content is neither lowercased nor rescanned per keyword.
+_KEYWORDS = ['python', 'programming', 'technology']
+_KEYWORDS_RE = re.compile('|'.join(map(re.escape, _KEYWORDS)), re.IGNORECASE)
+
 
 class CustomSourceExample(GenericRSSSource):
     """
@@ -61,11 +72,7 @@ class CustomSourceExample(GenericRSSSource):
         Returns:
             True if item should be processed, False otherwise
         """
-        # Example: Only process items with certain keywords
-        keywords = ['python', 'programming', 'technology']
-        content_lower = item.content.lower()
-        
-        return any(keyword in content_lower for keyword in keywords)
+        return _KEYWORDS_RE.search(item.content) is not None
     
     def _apply_custom_processing(self, item: RSSItem) -> RSSItem:
         """
@@ -99,17 +106,8 @@ class CustomSourceExample(GenericRSSSource):
         Returns:
             Cleaned content text
         """
-        # Example: Remove common HTML artifacts
-        content = content.replace('&nbsp;', ' ')
-        content = content.replace('&amp;', '&')
-        content = content.replace('&lt;', '<')
-        content = content.replace('&gt;', '>')
-        
-        # Example: Remove excessive whitespace
-        import re
-        content = re.sub(r'\s+', ' ', content)
-        
-        return content.strip()
+        # Example: Decode HTML entities and collapse whitespace in two C-level passes
+        return _WHITESPACE_RE.sub(' ', html.unescape(content)).strip()
     
     def get_source_info(self) -> Dict[str, Any]:
         """
@@ -172,15 +170,8 @@ class BlogSource(GenericRSSSource):
     
     def _clean_blog_content(self, content: str) -> str:
         """Clean up blog-specific content"""
-        # Remove common blog artifacts
-        content = content.replace('Read more...', '')
-        content = content.replace('Continue reading...', '')
-        
-        # Remove social media sharing buttons text
-        content = content.replace('Share this:', '')
-        content = content.replace('Tweet this:', '')
-        
-        return content.strip()
+        # Remove common blog artifacts and social media sharing buttons text
+        return _BLOG_JUNK_RE.sub('', content).strip()
 
 
 # Example usage functions
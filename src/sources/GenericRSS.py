@@ -1,64 +1,107 @@
-import feedparser
+import html
+import logging
 import requests
+import time
 from datetime import datetime
 from typing import List, Dict, Any
-from bs4 import BeautifulSoup
+import lxml.etree
+import lxml.html
 from .BaseSource import BaseSource, RSSItem
+from .utils import fetch_feed, visible_texts
+
+logger = logging.getLogger(__name__)
+
+# Seconds a parsed feed is reused for metadata lookups before it is fetched again
+FEED_CACHE_TTL = 60
+
+# Entry fields holding the article body, in order of preference
+_CONTENT_FIELDS = ('content', 'summary', 'description')
+
+
+def _entry_guid(entry) -> str:
+    """Guid of a feed entry, falling back to its link like RSSItem does"""
+    return entry.get('id') or entry.get('link', '')
+
+
+
+def _is_success(feed) -> bool:
+    """Whether the feed was fetched with a 2xx response, as opposed to an error placeholder"""
+    return 200 <= feed.get('status', 0) < 300
 
 
 class GenericRSSSource(BaseSource):
     """Generic RSS source that can handle most standard RSS feeds"""
     
     def __init__(self, name: str, url: str, timeout: int = 30):
-        super().__init__(name, url)
+        super().__init__(name)
+        self.url = url
         self.timeout = timeout
+        self._feed_cache = None
+        self._feed_cache_ts = 0.0
     
     def consume(self) -> List[RSSItem]:
         """Consume the RSS feed and return parsed items"""
         try:
-            # Parse the RSS feed
-            feed = feedparser.parse(self.url)
+            # Parse the RSS feed, letting the server answer 304 when nothing changed
+            feed = fetch_feed(self.url, etag=self.etag, modified=self.modified, timeout=self.timeout)
+            if feed.get('status') == 304:
+                # Feed unchanged since the last fetch, so a cached copy is still current
+                if self._feed_cache is not None:
+                    self._feed_cache_ts = time.monotonic()
+                return []
+            if not _is_success(feed):
+                logger.warning("Could not fetch feed %s: %s", self.name, feed.get('bozo_exception'))
+                return []
+            self.etag = feed.get('etag')
+            self.modified = feed.get('modified')
+            self._cache_feed(feed)
             
             if feed.bozo:
-                print(f"Warning: Feed {self.name} has parsing issues")
+                logger.warning("Feed %s has parsing issues: %s", self.name, feed.get('bozo_exception'))
             
-            items = []
-            for entry in feed.entries:
-                try:
-                    # Extract content
-                    content = self._extract_content(entry)
-                    
-                    # Parse publication date
-                    published = self._parse_date(entry)
-                    
-                    # Create RSS item
-                    item = RSSItem(
-                        title=entry.get('title', 'No Title'),
-                        link=entry.get('link', ''),
-                        description=entry.get('description', ''),
-                        published=published,
-                        content=content,
-                        source=self.name,
-                        guid=entry.get('id', entry.get('link', ''))
-                    )
-                    items.append(item)
-                    
-                except Exception as e:
-                    print(f"Error processing item from {self.name}: {e}")
-                    continue
+            # Entries returned before are skipped before any item is built
+            entries = [
+                entry for entry in feed.entries
+                if _entry_guid(entry) not in self._seen_guids
+                and entry.get('link', '') not in self.known_links
+            ]
             
+            # Well-formed feeds convert in one pass; only a failing feed pays for
+            # per-entry error handling, which then skips just the broken entries
+            try:
+                items = [self._create_item(entry) for entry in entries]
+            except Exception:
+                items = []
+                for entry in entries:
+                    try:
+                        items.append(self._create_item(entry))
+                    except Exception:
+                        logger.exception("Error processing item from %s", self.name)
+            
+            self._remember_guids(item.guid for item in items)
             return items
             
-        except Exception as e:
-            print(f"Error consuming feed {self.name}: {e}")
+        except Exception:
+            logger.exception("Error consuming feed %s", self.name)
             return []
     
+    def _create_item(self, entry) -> RSSItem:
+        """Build an RSS item from a feed entry"""
+        get = entry.get
+        return RSSItem(
+            title=get('title', 'No Title'),
+            link=get('link', ''),
+            description=get('description', ''),
+            published=self._parse_date(entry),
+            content=self._extract_content(entry),
+            source=self.name,
+            guid=_entry_guid(entry)
+        )
+    
     def _extract_content(self, entry) -> str:
         """Extract content from RSS entry"""
         # Try different content fields
-        content_fields = ['content', 'summary', 'description']
-        
-        for field in content_fields:
+        for field in _CONTENT_FIELDS:
             if field in entry:
                 content = entry[field]
                 if isinstance(content, list) and len(content) > 0:
@@ -69,30 +112,62 @@ class GenericRSSSource(BaseSource):
                     continue
                 
                 if content:
+                    # Plain text needs no parsing, only its entities decoded
+                    if '<' not in content:
+                        return html.unescape(content).strip()
+
                     # Clean HTML tags if present
-                    soup = BeautifulSoup(content, 'html.parser')
-                    return soup.get_text(strip=True)
+                    try:
+                        try:
+                            root = lxml.html.fromstring(content)
+                        except ValueError:
+                            # lxml refuses str input carrying an encoding declaration
+                            root = lxml.html.fromstring(
+                                content.encode('utf-8'),
+                                parser=lxml.html.HTMLParser(encoding='utf-8')
+                            )
+                    except lxml.etree.ParserError:
+                        return ''  # Nothing but comments or stray markup
+                    
+                    # Text nodes separated by a space, whitespace collapsed
+                    return ' '.join(' '.join(visible_texts(root)).split())
         
         return entry.get('description', '')
     
     def _parse_date(self, entry) -> datetime:
         """Parse publication date from entry"""
-        date_fields = ['published_parsed', 'updated_parsed', 'created_parsed']
-        
-        for field in date_fields:
-            if field in entry and entry[field]:
-                try:
-                    return datetime(*entry[field][:6])
-                except (ValueError, TypeError):
-                    continue
+        parsed = (entry.get('published_parsed')
+                  or entry.get('updated_parsed')
+                  or entry.get('created_parsed'))
+        try:
+            if parsed:
+                return datetime(*parsed[:6])
+        except (ValueError, TypeError):
+            pass
         
         # Fallback to current time
         return datetime.now()
     
+    def _cache_feed(self, feed) -> None:
+        """Remember a parsed feed for metadata lookups"""
+        self._feed_cache = feed
+        self._feed_cache_ts = time.monotonic()
+    
+    def _get_feed(self):
+        """Return the recently parsed feed, or parse it again once the cache expired"""
+        if self._feed_cache is not None and time.monotonic() - self._feed_cache_ts < FEED_CACHE_TTL:
+            return self._feed_cache
+        
+        # Unconditional fetch: the validators belong to consume, which must not miss entries
+        feed = fetch_feed(self.url, timeout=self.timeout)
+        if _is_success(feed):
+            self._cache_feed(feed)
+        return feed
+    
     def get_source_info(self) -> Dict[str, Any]:
         """Get source metadata"""
         try:
-            feed = feedparser.parse(self.url)
+            feed = self._get_feed()
             return {
                 'name': self.name,
                 'url': self.url,
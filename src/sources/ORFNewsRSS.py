@@ -7,11 +7,9 @@ You can use this as a template to create sources for specific websites or RSS fe
 
 from typing import List, Dict, Any
 
-from .utils import get_content_from_link
+from .utils import fetch_feed, get_contents_from_links
 from .BaseSource import BaseSource, RSSItem
 
-import feedparser
-
 
 class ORFNewsRSSSource(BaseSource):
     """
@@ -37,15 +35,35 @@ class ORFNewsRSSSource(BaseSource):
             List[RSSItem]: List of parsed RSS items
         """
         # Custom logic to fetch and parse the RSS feed would go here
-        feed = feedparser.parse(self.url)
+        feed = fetch_feed(self.url, etag=self.etag, modified=self.modified)
+        if feed.get('status') == 304:
+            return []  # Feed unchanged since the last fetch
+        self.etag = feed.get('etag')
+        self.modified = feed.get('modified')
+
+        entries = [item for item in feed.entries if item.link not in self.known_links]
+
+        # Article pages are fetched concurrently rather than one after another
+        contents = get_contents_from_links(
+            [item.link for item in entries], class_name='story-story'
+        )
+        if None in contents:
+            # Articles that failed transiently are left out; without validators the
+            # next poll fetches the whole feed again, so they are retried instead of
+            # skipped by a 304. Pages without article text are kept with empty content
+            # and so become known links that are not downloaded again
+            self.etag = None
+            self.modified = None
+
         return [
             RSSItem(
                 title=item.title,
                 link=item.link,
                 description=item.title,  # ORF News RSS does not provide a description
                 published=item.updated,
-                content=get_content_from_link(item.link, class_name='story-story'),
+                content=content,
                 source=self.name
             )
-            for item in feed.entries
+            for item, content in zip(entries, contents)
+            if content is not None
         ]
\ No newline at end of file
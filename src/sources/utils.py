@@ -1,31 +1,177 @@
+import feedparser
+import logging
 import requests
-from typing import Optional
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+import lxml.html
+from .BaseSource import BaseSource, RSSItem
+
+logger = logging.getLogger(__name__)
+
+# Shared across all sources so article fetches reuse keep-alive connections
+_SESSION = requests.Session()
+_SESSION.headers['User-Agent'] = 'intelligent-rss-consumer/1.0'
+_ADAPTER = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=64,
+    max_retries=Retry(total=3, backoff_factor=0.3)
+)
+_SESSION.mount('http://', _ADAPTER)
+_SESSION.mount('https://', _ADAPTER)
+
+# Seconds to wait for a server before giving up on an article
+REQUEST_TIMEOUT = 15
+
+# Article pages are read up to this many bytes; anything beyond is dropped unread
+MAX_PAGE_BYTES = 2_000_000
+
+def _empty_feed(status: int, etag: Optional[str], modified: Optional[str], error: Optional[Exception] = None):
+    """Feed without entries, shaped like a feedparser result"""
+    return feedparser.FeedParserDict(
+        feed=feedparser.FeedParserDict(),
+        entries=[],
+        bozo=error is not None,
+        bozo_exception=error,
+        status=status,
+        etag=etag,
+        modified=modified
+    )
+
+def fetch_feed(
+    url: str,
+    etag: Optional[str] = None,
+    modified: Optional[str] = None,
+    timeout: int = REQUEST_TIMEOUT
+) -> feedparser.FeedParserDict:
+    """
+    Downloads a feed over the shared session and parses the bytes with feedparser.
+    etag and modified of the last fetch are sent as conditional headers, so an unchanged feed
+    comes back without entries and with status 304, as feedparser.parse(url) would report it.
+    Failed requests also return an empty feed, flagged as bozo, and keep the given validators.
+    """
+    headers = {}
+    if etag:
+        headers['If-None-Match'] = etag
+    if modified:
+        headers['If-Modified-Since'] = modified
+
+    try:
+        response = _SESSION.get(url, headers=headers, timeout=timeout)
+    except requests.exceptions.RequestException as e:
+        return _empty_feed(0, etag, modified, e)
+
+    if response.status_code == 304:
+        return _empty_feed(304, etag, modified)
+    if not response.ok:
+        return _empty_feed(response.status_code, etag, modified, requests.HTTPError(response.reason))
+
+    # feedparser looks headers up in lowercase, requests keeps the server's spelling.
+    # Parsed from bytes the feed has no URL, so the final one is passed as
+    # content-location for feedparser to resolve relative links against
+    response_headers = {key.lower(): value for key, value in response.headers.items()}
+    response_headers['content-location'] = response.url
+    feed = feedparser.parse(response.content, response_headers=response_headers)
+    feed['status'] = response.status_code
+    feed['etag'] = response.headers.get('ETag')
+    feed['modified'] = response.headers.get('Last-Modified')
+    return feed
+
+def visible_texts(element) -> List[str]:
+    """
+    Collects the stripped, non-empty text nodes below an lxml element in document order.
+    Text of embedded scripts and stylesheets is left out.
+    """
+    texts = element.xpath('.//text()[not(ancestor::script or ancestor::style)]')
+    return [text.strip() for text in texts if text.strip()]
 
 def get_content_from_link(
     url: str,
     tag_name: Optional[str] = None,
     class_name: Optional[str] = None
-) -> str:
+) -> Optional[str]:
     """
     Fetches the content of a webpage and extracts text from a specific HTML tag or class name.
     The use of tag_name or class_name is exclusive.
+    Returns an empty string for pages that will not yield text on a retry either
+    (client errors, no such element) and None for transient failures (network
+    errors, server errors) worth fetching again.
     """
     try:
-        response = requests.get(url)
-        response.raise_for_status()
+        with _SESSION.get(url, timeout=REQUEST_TIMEOUT, stream=True) as response:
+            response.raise_for_status()
+            body = response.raw.read(MAX_PAGE_BYTES, decode_content=True)
+            # requests falls back to ISO-8859-1 for text/html without a charset,
+            # which would override the page's own <meta charset>
+            declared = 'charset=' in response.headers.get('Content-Type', '').lower()
+            encoding = response.encoding if declared else None
 
-        soup = BeautifulSoup(response.text, 'html.parser')
+        # Raw bytes, decoded with the declared charset or else detected by lxml
+        parser = lxml.html.HTMLParser(encoding=encoding)
+        document = lxml.html.fromstring(body, parser=parser)
 
         if tag_name and not class_name:
-            elements = soup.find_all(tag_name)
+            elements = document.xpath(f'//{tag_name}')
         elif class_name and not tag_name:
-            elements = soup.find_all(class_=class_name)
+            elements = document.xpath(
+                f"//*[contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')]"
+            )
         else:
             raise Exception ("Specify either tag_name or class_name, not both.")
 
-        return elements[-1].get_text(separator='\n', strip=True)
+        if not elements:
+            # E.g. live tickers or video pages without an article body
+            logger.info("No article text found at %s", url)
+            return ''
+
+        # Text nodes one per line like BeautifulSoup's get_text(separator='\n', strip=True)
+        return '\n'.join(visible_texts(elements[-1]))
+    except requests.exceptions.HTTPError as e:
+        logger.warning("Error fetching the URL %s: %s", url, e)
+        return None if e.response is None or e.response.status_code >= 500 else ''
     except requests.exceptions.RequestException as e:
-        return f"Error fetching the URL: {e}"
+        logger.warning("Error fetching the URL %s: %s", url, e)
+        return None
     except Exception as e:
-        return f"An error occurred: {e}"
\ No newline at end of file
+        logger.warning("An error occurred extracting %s: %s", url, e)
+        return ''
+
+def get_contents_from_links(
+    urls: List[str],
+    tag_name: Optional[str] = None,
+    class_name: Optional[str] = None,
+    max_workers: int = 16
+) -> List[Optional[str]]:
+    """
+    Fetches several webpages concurrently and extracts their text like get_content_from_link.
+    Results are returned in the order of the given URLs, None for transient failures.
+    """
+    if not urls:
+        return []
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(urls))) as executor:
+        return list(executor.map(
+            lambda url: get_content_from_link(url, tag_name=tag_name, class_name=class_name),
+            urls
+        ))
+
+def consume_many(sources: List[BaseSource], max_workers: int = 32) -> List[List[RSSItem]]:
+    """
+    Consumes several sources concurrently, each against its own host.
+    Results are returned in the order of the given sources, one item list per source.
+    A source whose consume() raises is logged and yields no items, so it cannot
+    take the other sources down with it.
+    """
+    if not sources:
+        return []
+
+    def consume(source: BaseSource) -> List[RSSItem]:
+        try:
+            return source.consume()
+        except Exception:
+            logger.exception("Error consuming source %s", source.name)
+            return []
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(sources))) as executor:
+        return list(executor.map(consume, sources))
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Modules import each other relative to src, as when running src/main.py
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
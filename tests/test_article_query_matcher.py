@@ -0,0 +1,56 @@
+import pytest
+
+pytest.importorskip("vllm")
+
+from llm.ArticleQueryMatcher import ANSWER_TOKENS, BOUNDARY_TOKENS, ArticleQueryMatcher
+from llm.utils import MAX_MODEL_LEN, PROMPT_TEMPLATE
+
+
+class WordTokenizer:
+    """One token per whitespace-separated word; decoding adds a marker token"""
+
+    def encode(self, text, add_special_tokens=False):
+        return text.split()
+
+    def decode(self, token_ids):
+        # Re-encoding this text yields one token more than was decoded
+        return " ".join(token_ids) + " …"
+
+    def apply_chat_template(self, messages, tokenize=True, add_generation_prompt=True):
+        return ["<user>"] + messages[0]["content"].split() + ["<assistant>"]
+
+
+@pytest.fixture
+def matcher():
+    # Bypass __init__ so no model is loaded
+    matcher = ArticleQueryMatcher.__new__(ArticleQueryMatcher)
+    matcher.tokenizer = WordTokenizer()
+    return matcher
+
+
+def test_article_budget_accounts_for_rendered_prompt(matcher):
+    prompt_tokens = len(PROMPT_TEMPLATE.format(article_text="", query="Wer gewinnt?").split()) + 2
+
+    budget = matcher._article_budget("Wer gewinnt?")
+
+    assert budget == MAX_MODEL_LEN - prompt_tokens - ANSWER_TOKENS - BOUNDARY_TOKENS
+
+
+def test_truncate_keeps_short_articles(matcher):
+    text = "kurzer Artikel"
+
+    assert matcher._truncate(text, matcher._encode(text), 5) == text
+
+
+def test_truncate_fits_budget_despite_re_encoding_drift(matcher):
+    text = " ".join(f"w{i}" for i in range(20))
+
+    truncated = matcher._truncate(text, matcher._encode(text), 10)
+
+    assert len(matcher._encode(truncated)) <= 10
+
+
+def test_overlong_query_is_not_sent_to_the_model(matcher):
+    query = " ".join(["lang"] * MAX_MODEL_LEN)
+
+    assert matcher.check_match_many([("Artikel", query)]) == [False]
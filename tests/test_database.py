@@ -0,0 +1,103 @@
+import pytest
+
+import database.RSSDatabase as rss_database
+from database.RSSDatabase import RSSDatabase
+from sources.BaseSource import RSSItem
+
+
+def make_item(title, link, content="content", source="Source"):
+    return RSSItem(title, link, "description", "2024-01-01", content, source)
+
+
+@pytest.fixture
+def database(tmp_path):
+    db = RSSDatabase(str(tmp_path / "rss.db"))
+    yield db
+    db.close()
+
+
+def add_queries(database, *queries):
+    with database._connection() as conn:
+        conn.executemany("INSERT INTO queries (query, resolved) VALUES (?, ?)", queries)
+
+
+def unmatched(database, source="Source"):
+    return {item.link: query_ids for _, item, query_ids in database.get_unmatched_items(source)}
+
+
+def test_store_rss_items_ignores_known_links(database):
+    assert database.store_rss_items([make_item("a", "l1"), make_item("b", "l2")]) == 2
+    assert database.store_rss_items([make_item("a", "l1")]) == 0
+    assert database.get_known_links("Source") == {"l1", "l2"}
+
+
+def test_unmatched_items_cover_every_open_query(database):
+    database.store_rss_items([make_item("a", "l1"), make_item("b", "l2")])
+    add_queries(database, ("open", 0), ("null", None), ("done", 1))
+
+    assert unmatched(database) == {"l1": {1, 2}, "l2": {1, 2}}
+    assert unmatched(database, "Other") == {}
+
+
+def test_results_and_skips_settle_pairs(database):
+    database.store_rss_items([make_item("a", "l1"), make_item("b", "l2")])
+    add_queries(database, ("first", 0), ("second", 0))
+    ids = {item.link: item_id for item_id, item, _ in database.get_unmatched_items("Source")}
+
+    database.store_llm_results_batch([(1, ids["l1"], False)])
+    database.store_skipped_matches([(1, ids["l2"]), (2, ids["l1"])])
+
+    assert unmatched(database) == {"l2": {2}}
+
+
+def test_items_with_duplicate_titles_are_settled_separately(database):
+    database.store_rss_items([make_item("same", "l1"), make_item("same", "l2")])
+    add_queries(database, ("query", 0))
+
+    for _ in range(3):
+        pending = database.get_unmatched_items("Source")
+        database.store_llm_results_batch((1, item_id, False) for item_id, _, _ in pending)
+
+    assert unmatched(database) == {}
+    with database._connection() as conn:
+        rows = conn.execute("SELECT item_id FROM llm_results ORDER BY item_id").fetchall()
+    assert len(rows) == 2
+    assert rows[0] != rows[1]
+
+
+def test_resolve_query_with_item(database):
+    database.store_rss_items([make_item("a", "l1")])
+    add_queries(database, ("query", 0))
+    item_id = database.get_unmatched_items("Source")[0][0]
+
+    assert database.resolve_query_with_item(1, item_id)
+    assert database.get_queries(False) == []
+    assert database.get_queries(True)[0]["resolved_by"] == item_id
+    assert unmatched(database) == {}
+
+
+def test_open_queries_include_null_resolved(database):
+    add_queries(database, ("open", 0), ("null", None), ("done", 1))
+
+    assert {query["query"] for query in database.get_queries(False)} == {"open", "null"}
+    assert [query["query"] for query in database.get_queries(True)] == ["done"]
+
+
+def test_llm_cache_keeps_the_most_recent_results(database, monkeypatch):
+    monkeypatch.setattr(rss_database, "LLM_CACHE_LIMIT", 2)
+
+    database.store_cached_llm_results({"a": True, "b": False})
+    database.store_cached_llm_results({"c": True})
+
+    assert database.get_cached_llm_results(["a", "b", "c"]) == {"b": False, "c": True}
+
+
+def test_source_info_round_trip(database):
+    assert database.get_source_info("Source") is None
+
+    database.store_source_info("Source", "https://example.com/feed", '"etag"', "Mon, 01 Jan 2024")
+
+    info = database.get_source_info("Source")
+    assert info["url"] == "https://example.com/feed"
+    assert info["etag"] == '"etag"'
+    assert info["modified"] == "Mon, 01 Jan 2024"
@@ -0,0 +1,47 @@
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("feedparser")
+pytest.importorskip("lxml")
+pytest.importorskip("requests")
+
+from sources.GenericRSS import GenericRSSSource
+
+
+@pytest.fixture
+def source():
+    return GenericRSSSource("Generic", "https://example.com/feed")
+
+
+@pytest.mark.parametrize(
+    "content, expected",
+    [
+        ("Plain text ", "Plain text"),
+        ("Q&amp;A", "Q&A"),
+        ("<p>Hello</p><p>World</p>", "Hello World"),
+        ("<p>a &amp; b</p><script>var x = 1</script><style>p {}</style>", "a & b"),
+        ('<?xml version="1.0" encoding="utf-8"?><p>Grüße</p>', "Grüße"),
+        ("<!-- comment -->", ""),
+    ],
+)
+def test_extract_content(source, content, expected):
+    assert source._extract_content({"summary": content}) == expected
+
+
+def test_extract_content_prefers_content_field(source):
+    entry = {"content": [{"value": "<b>Body</b>"}], "summary": "Summary"}
+
+    assert source._extract_content(entry) == "Body"
+
+
+def test_parse_date_uses_first_available_field(source):
+    entry = {"published_parsed": None, "updated_parsed": (2024, 5, 6, 7, 8, 9, 0, 0, 0)}
+
+    assert source._parse_date(entry) == datetime(2024, 5, 6, 7, 8, 9)
+
+
+def test_parse_date_falls_back_to_now(source):
+    before = datetime.now()
+
+    assert source._parse_date({}) >= before
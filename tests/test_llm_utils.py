@@ -0,0 +1,52 @@
+from llm.utils import BM25Index, cache_namespace, match_cache_key, tokenize
+
+
+def test_tokenize_lowercases_words():
+    assert tokenize("Wien, WIEN und Graz!") == ["wien", "wien", "und", "graz"]
+
+
+def test_top_n_ranks_by_query_term_weight():
+    index = BM25Index([
+        "graz news about football",
+        "wien wien wien election results",
+        "wien weather report",
+    ])
+
+    assert index.top_n("wien", 3) == [1, 2]
+
+
+def test_top_n_never_returns_zero_score_documents():
+    index = BM25Index(["stock market", "football results", "weather report"])
+
+    assert index.top_n("election", 3) == []
+    assert index.scores("election") == [0.0, 0.0, 0.0]
+
+
+def test_top_n_limits_the_number_of_results():
+    index = BM25Index(["wien a", "wien b", "wien c"])
+
+    assert len(index.top_n("wien", 2)) == 2
+
+
+def test_top_n_only_considers_given_positions():
+    index = BM25Index(["wien wien", "wien", "graz"])
+
+    assert index.top_n("wien", 3, {1, 2}) == [1]
+    assert index.top_n("wien", 3, set()) == []
+
+
+def test_empty_index_scores_nothing():
+    index = BM25Index([])
+
+    assert index.scores("wien") == []
+    assert index.top_n("wien", 5) == []
+
+
+def test_cache_key_depends_on_texts_and_namespace():
+    namespace = cache_namespace()
+    key = match_cache_key("Artikel", "Frage", namespace)
+
+    assert key == match_cache_key("Artikel", "Frage", namespace)
+    assert key != match_cache_key("Artikel", "Andere Frage", namespace)
+    assert key != match_cache_key("Artikel", "Frage", cache_namespace("other/model"))
+    assert key != match_cache_key("Artikel", "Frage", cache_namespace(quantization="awq"))
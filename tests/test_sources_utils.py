@@ -0,0 +1,135 @@
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("feedparser")
+pytest.importorskip("lxml")
+pytest.importorskip("requests")
+
+from sources.BaseSource import BaseSource
+from sources.utils import consume_many, fetch_feed, get_content_from_link
+
+FEED = b"""<?xml version="1.0" encoding="utf-8"?>
+<rss version="2.0"><channel><title>Feed</title>
+<item><title>Relative</title><link>/articles/a.html</link><description>d</description></item>
+<item><title>Absolute</title><link>https://example.com/b.html</link><description>d</description></item>
+</channel></rss>"""
+
+ROUTES = {
+    "/feed.xml": (200, {"Content-Type": "application/rss+xml; charset=utf-8", "ETag": '"v1"'}, FEED),
+    "/broken.xml": (500, {"Content-Type": "text/plain"}, b"down"),
+    "/article.html": (
+        200,
+        {"Content-Type": "text/html"},
+        '<html><head><meta charset="utf-8"></head><body><div class="story-story">'
+        "<p>Grüße aus Österreich</p><script>var ad = 1;</script><p>Zweiter Absatz</p>"
+        "</div></body></html>".encode("utf-8"),
+    ),
+    "/video.html": (200, {"Content-Type": "text/html"}, b"<html><body><div>Video</div></body></html>"),
+    "/gone.html": (404, {"Content-Type": "text/html"}, b"gone"),
+    "/error.html": (503, {"Content-Type": "text/html"}, b"busy"),
+}
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        status, headers, body = ROUTES[self.path]
+        if headers.get("ETag") and self.headers.get("If-None-Match") == headers["ETag"]:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+def test_fetch_feed_parses_and_resolves_relative_links(server):
+    feed = fetch_feed(f"{server}/feed.xml")
+
+    assert feed.status == 200
+    assert not feed.bozo
+    assert feed.etag == '"v1"'
+    assert [entry.link for entry in feed.entries] == [
+        f"{server}/articles/a.html",
+        "https://example.com/b.html",
+    ]
+
+
+def test_fetch_feed_returns_empty_feed_on_304(server):
+    feed = fetch_feed(f"{server}/feed.xml", etag='"v1"', modified="Mon, 01 Jan 2024 00:00:00 GMT")
+
+    assert feed.status == 304
+    assert feed.entries == []
+    assert feed.etag == '"v1"'
+    assert feed.modified == "Mon, 01 Jan 2024 00:00:00 GMT"
+
+
+def test_fetch_feed_keeps_validators_on_http_error(server):
+    feed = fetch_feed(f"{server}/broken.xml", etag='"v0"')
+
+    assert feed.status == 500
+    assert feed.bozo
+    assert feed.entries == []
+    assert feed.etag == '"v0"'
+
+
+def test_fetch_feed_reports_unreachable_hosts():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    feed = fetch_feed(f"http://127.0.0.1:{port}/feed.xml", timeout=1)
+
+    assert feed.status == 0
+    assert feed.bozo
+    assert feed.entries == []
+
+
+def test_get_content_from_link_extracts_visible_text(server):
+    content = get_content_from_link(f"{server}/article.html", class_name="story-story")
+
+    assert content == "Grüße aus Österreich\nZweiter Absatz"
+
+
+def test_get_content_from_link_separates_permanent_and_transient_failures(server):
+    assert get_content_from_link(f"{server}/video.html", class_name="story-story") == ""
+    assert get_content_from_link(f"{server}/gone.html", class_name="story-story") == ""
+    assert get_content_from_link(f"{server}/error.html", class_name="story-story") is None
+
+
+class StaticSource(BaseSource):
+    def __init__(self, name, items):
+        super().__init__(name)
+        self.items = items
+
+    def consume(self):
+        return self.items
+
+
+class FailingSource(BaseSource):
+    def consume(self):
+        raise AttributeError("object has no attribute 'updated'")
+
+
+def test_consume_many_isolates_failing_sources():
+    sources = [StaticSource("first", ["a"]), FailingSource("broken"), StaticSource("last", ["b"])]
+
+    assert consume_many(sources) == [["a"], [], ["b"]]